@@ -3,8 +3,12 @@ Agent Hooks system for WordPress Plugin Generator.
 Implements lifecycle hooks for monitoring, logging, and error handling following OpenAI Agents Python best practices.
 """
 
+import sys
+import copy
 import time
 import json
+import functools
+from collections import Counter, deque
 from typing import Dict, Any, Optional, List, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -14,6 +18,18 @@ from loguru import logger
 from context_manager import context_manager, PluginGenerationContext
 from security_guardrails import security_guardrails, input_guardrail, output_guardrail
 
+# Maximum number of events kept in the in-memory event log
+MAX_EVENTS = 10000
+
+# Number of most recent failed events kept for the error timeline
+MAX_RECENT_ERRORS = 20
+
+# Average agent duration (seconds) above which an agent is considered slow
+SLOW_AGENT_THRESHOLD = 30
+
+# dataclass(slots=True) is only available on Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class HookType(Enum):
     """Types of hooks available."""
@@ -27,7 +43,7 @@ class HookType(Enum):
     SECURITY_CHECK = "security_check"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class HookEvent:
     """Represents a hook event."""
     hook_type: HookType
@@ -38,17 +54,121 @@ class HookEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
     error: Optional[str] = None
     success: bool = True
+    hook_type_value: str = field(init=False, repr=False)
+    timestamp_iso: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # Cache the enum value and ISO timestamp; monitoring tools read them for every event
+        self.hook_type_value = self.hook_type.value
+        self.timestamp_iso = self.timestamp.isoformat()
+
+
+def _decrement(counter: Counter, key: str):
+    """Decrement a counter entry, dropping it once it reaches zero."""
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
 
 
 class PluginGeneratorHooks:
     """Hooks implementation for WordPress Plugin Generator."""
     
     def __init__(self):
-        self.events: List[HookEvent] = []
+        self.events: deque = deque(maxlen=MAX_EVENTS)
         self.performance_metrics: Dict[str, List[float]] = {}
-        self.error_counts: Dict[str, int] = {}
+        self._duration_totals: Dict[str, float] = {}
+        self._slow_agents: set = set()
+        self.error_counts: Counter = Counter()
         self.active_operations: Dict[str, datetime] = {}
         self.callbacks: Dict[HookType, List[Callable]] = {hook_type: [] for hook_type in HookType}
+        # Bumped whenever the event log changes, used to invalidate cached reports
+        self._version = 0
+        self.session_version: Dict[str, int] = {}
+        self._cached_session_report = functools.lru_cache(maxsize=64)(self._build_session_report)
+        self._reset_aggregates()
+    
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever the event log changes."""
+        return self._version
+    
+    def _reset_aggregates(self):
+        """Reset the incrementally maintained event aggregates."""
+        self.recent_errors: deque = deque(maxlen=MAX_RECENT_ERRORS)
+        self.total_error_count = 0
+        self.security_check_count = 0
+        self.security_violation_count = 0
+        self._agent_error_counter: Counter = Counter()
+        self._tool_error_counter: Counter = Counter()
+        self._error_pattern_counter: Counter = Counter()
+    
+    def _update_aggregates(self, event: HookEvent):
+        """Fold a single event into the running aggregates."""
+        if event.hook_type == HookType.SECURITY_CHECK:
+            self.security_check_count += 1
+            if not event.success:
+                self.security_violation_count += 1
+        
+        if not event.success:
+            self.recent_errors.append(event)
+            self.total_error_count += 1
+            self._agent_error_counter[event.agent_name] += 1
+            if event.tool_name:
+                self._tool_error_counter[event.tool_name] += 1
+            if event.error:
+                self._error_pattern_counter[event.error.lower()] += 1
+    
+    def _retract_aggregates(self, event: HookEvent):
+        """Remove an event evicted from the event log from the running aggregates."""
+        if event.hook_type == HookType.SECURITY_CHECK:
+            self.security_check_count -= 1
+            if not event.success:
+                self.security_violation_count -= 1
+        
+        if not event.success:
+            # Evicted events are the oldest, so an evicted error can only be
+            # the leftmost entry of the recent error timeline
+            if self.recent_errors and self.recent_errors[0] is event:
+                self.recent_errors.popleft()
+            self.total_error_count -= 1
+            _decrement(self._agent_error_counter, event.agent_name)
+            if event.tool_name:
+                _decrement(self._tool_error_counter, event.tool_name)
+            if event.error:
+                _decrement(self._error_pattern_counter, event.error.lower())
+    
+    def _average_duration(self, agent_name: str) -> float:
+        """Average duration for an agent from its running total."""
+        times = self.performance_metrics.get(agent_name)
+        return self._duration_totals[agent_name] / len(times) if times else 0
+    
+    def _update_slow_agents(self, agent_name: str, duration: float):
+        """Track whether an agent's average duration is above the slow threshold."""
+        self._duration_totals[agent_name] = self._duration_totals.get(agent_name, 0) + duration
+        
+        if self._average_duration(agent_name) > SLOW_AGENT_THRESHOLD:
+            self._slow_agents.add(agent_name)
+        else:
+            self._slow_agents.discard(agent_name)
+    
+    def _record_event(self, event: HookEvent):
+        """Store an event, update aggregates and trigger callbacks."""
+        # Evict the oldest event ourselves so its aggregate contribution goes with it
+        if len(self.events) == self.events.maxlen:
+            evicted = self.events.popleft()
+            self._retract_aggregates(evicted)
+            self._bump_session_version(evicted)
+        self.events.append(event)
+        self._version += 1
+        self._bump_session_version(event)
+        self._update_aggregates(event)
+        self.trigger_callbacks(event)
+    
+    def _bump_session_version(self, event: HookEvent):
+        """Invalidate the cached report of the session an event belongs to."""
+        session_id = event.metadata.get("session_id")
+        if session_id:
+            self.session_version[session_id] = self.session_version.get(session_id, 0) + 1
     
     def register_callback(self, hook_type: HookType, callback: Callable):
         """Register a callback for a specific hook type."""
@@ -85,8 +205,7 @@ class PluginGeneratorHooks:
             }
         )
         
-        self.events.append(event)
-        self.trigger_callbacks(event)
+        self._record_event(event)
         
         logger.info(f"🚀 Agent started: {agent_name}")
     
@@ -104,6 +223,7 @@ class PluginGeneratorHooks:
             if agent_name not in self.performance_metrics:
                 self.performance_metrics[agent_name] = []
             self.performance_metrics[agent_name].append(duration)
+            self._update_slow_agents(agent_name, duration)
         
         # Update context
         if context:
@@ -118,7 +238,7 @@ class PluginGeneratorHooks:
         
         # Track error counts
         if not success and error:
-            self.error_counts[agent_name] = self.error_counts.get(agent_name, 0) + 1
+            self.error_counts[agent_name] += 1
         
         # Create event
         event = HookEvent(
@@ -131,12 +251,11 @@ class PluginGeneratorHooks:
             metadata={
                 "session_id": context.session_id if context else None,
                 "phase": context.current_phase if context else "unknown",
-                "performance_avg": sum(self.performance_metrics.get(agent_name, [0])) / len(self.performance_metrics.get(agent_name, [1])) if self.performance_metrics.get(agent_name) else 0
+                "performance_avg": self._average_duration(agent_name)
             }
         )
         
-        self.events.append(event)
-        self.trigger_callbacks(event)
+        self._record_event(event)
         
         status = "✅" if success else "❌"
         duration_str = f" ({duration:.2f}s)" if duration else ""
@@ -168,8 +287,7 @@ class PluginGeneratorHooks:
             }
         )
         
-        self.events.append(event)
-        self.trigger_callbacks(event)
+        self._record_event(event)
         
         logger.debug(f"🔧 Tool started: {tool_name} (agent: {agent_name})")
     
@@ -218,8 +336,7 @@ class PluginGeneratorHooks:
             }
         )
         
-        self.events.append(event)
-        self.trigger_callbacks(event)
+        self._record_event(event)
         
         status = "✅" if success else "❌"
         duration_str = f" ({duration:.2f}s)" if duration else ""
@@ -248,8 +365,7 @@ class PluginGeneratorHooks:
             }
         )
         
-        self.events.append(event)
-        self.trigger_callbacks(event)
+        self._record_event(event)
         
         logger.info(f"🔄 Handoff: {from_agent} → {to_agent}")
     
@@ -274,8 +390,7 @@ class PluginGeneratorHooks:
             }
         )
         
-        self.events.append(event)
-        self.trigger_callbacks(event)
+        self._record_event(event)
         
         logger.error(f"❌ Error in {agent_name}: {message}")
     
@@ -311,8 +426,7 @@ class PluginGeneratorHooks:
                 }
             )
             
-            self.events.append(event)
-            self.trigger_callbacks(event)
+            self._record_event(event)
             
             if violations:
                 logger.warning(f"🔒 Security violations detected in {tool_name}: {len(violations)} issues")
@@ -328,26 +442,52 @@ class PluginGeneratorHooks:
         
         for agent_name, times in self.performance_metrics.items():
             if times:
+                total_time = self._duration_totals[agent_name]
                 summary[agent_name] = {
-                    "avg_duration": sum(times) / len(times),
+                    "avg_duration": total_time / len(times),
                     "min_duration": min(times),
                     "max_duration": max(times),
                     "total_runs": len(times),
-                    "total_time": sum(times)
+                    "total_time": total_time
                 }
         
         return summary
     
+    def slow_agents(self) -> List[str]:
+        """Names of agents whose average duration is above SLOW_AGENT_THRESHOLD, sorted."""
+        return sorted(self._slow_agents)
+    
+    def error_aggregates(self) -> Dict[str, Counter]:
+        """Copies of the error counters by message pattern, agent and tool."""
+        return {
+            "patterns": self._error_pattern_counter.copy(),
+            "agents": self._agent_error_counter.copy(),
+            "tools": self._tool_error_counter.copy()
+        }
+    
     def get_error_summary(self) -> Dict[str, Any]:
         """Get error summary for all agents."""
         return {
-            "error_counts": self.error_counts.copy(),
+            "error_counts": dict(self.error_counts),
             "total_errors": sum(self.error_counts.values()),
-            "most_errors": max(self.error_counts.items(), key=lambda x: x[1]) if self.error_counts else None
+            "most_errors": self.error_counts.most_common(1)[0] if self.error_counts else None
+        }
+    
+    def get_combined_summary(self) -> Dict[str, Any]:
+        """Get performance and error summaries in a single call."""
+        return {
+            "performance": self.get_performance_summary(),
+            "errors": self.get_error_summary()
         }
     
     def get_session_report(self, session_id: str) -> Dict[str, Any]:
-        """Get detailed report for a specific session."""
+        """Get detailed report for a specific session (cached until its events change)."""
+        report = self._cached_session_report(session_id, self.session_version.get(session_id, 0))
+        # Callers may modify the report and its nested lists, so hand out a deep copy
+        return copy.deepcopy(report)
+    
+    def _build_session_report(self, session_id: str, version: int) -> Dict[str, Any]:
+        """Build the session report; version only serves as part of the cache key."""
         session_events = [e for e in self.events if e.metadata.get("session_id") == session_id]
         
         if not session_events:
@@ -373,8 +513,8 @@ class PluginGeneratorHooks:
             "success_rate": (len(session_events) - len(errors)) / len(session_events) * 100 if session_events else 0,
             "timeline": [
                 {
-                    "timestamp": e.timestamp.isoformat(),
-                    "type": e.hook_type.value,
+                    "timestamp": e.timestamp_iso,
+                    "type": e.hook_type_value,
                     "agent": e.agent_name,
                     "tool": e.tool_name,
                     "success": e.success,
@@ -389,9 +529,16 @@ class PluginGeneratorHooks:
         cutoff_time = datetime.now().timestamp() - (max_age_hours * 3600)
         
         old_count = len(self.events)
-        self.events = [e for e in self.events if e.timestamp.timestamp() > cutoff_time]
+        self.events = deque((e for e in self.events if e.timestamp.timestamp() > cutoff_time), maxlen=MAX_EVENTS)
         new_count = len(self.events)
         
+        # Rebuild aggregates from the surviving events
+        self._version += 1
+        self._cached_session_report.cache_clear()
+        self._reset_aggregates()
+        for event in self.events:
+            self._update_aggregates(event)
+        
         if old_count > new_count:
             logger.info(f"Cleared {old_count - new_count} old events")
 
@@ -435,7 +582,7 @@ def on_error(error_type: str, message: str, agent_name: str, context: Optional[P
 def log_performance_callback(event: HookEvent):
     """Example callback to log performance metrics."""
     if event.hook_type == HookType.AGENT_END and event.duration:
-        if event.duration > 30:  # Log slow operations
+        if event.duration > SLOW_AGENT_THRESHOLD:  # Log slow operations
             logger.warning(f"Slow agent execution: {event.agent_name} took {event.duration:.2f}s")
 
 
@@ -62,6 +62,22 @@ class PluginGenerationContext:
             "phase": self.current_phase
         })
     
+    def get_security_notes(self) -> str:
+        """Get avoidance notes for recent security errors, cached until new errors arrive."""
+        error_count = len(self.errors_encountered)
+        cached = getattr(self, "_security_notes", None)
+        if cached is not None and cached[0] == error_count:
+            return cached[1]
+        
+        notes = "".join(
+            f"- Avoid: {error.get('message', '')}\n"
+            for error in self.errors_encountered[-3:]  # Last 3 errors
+            if "security" in error.get("type", "").lower()
+        )
+        # Stored outside the dataclass fields so it never reaches to_dict()
+        self._security_notes = (error_count, notes)
+        return notes
+    
     def add_agent_message(self, agent: str, message: str, message_type: str = "info"):
         """Add an agent message to the context."""
         self.agent_messages.append({
@@ -4,11 +4,18 @@ Supports OpenAI models directly and any LiteLLM-supported model via flexible pre
 """
 
 import os
+import sys
+import functools
+import importlib
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
+from types import MappingProxyType
 from loguru import logger
 
+# dataclass(slots=True) is only available on Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 # Try to import agents components
 try:
     from agents import (
@@ -25,13 +32,27 @@ except ImportError:
     logger.warning("OpenAI Agents SDK not fully available")
     AGENTS_AVAILABLE = False
 
-# Try to import LiteLLM support
-try:
-    from agents.extensions.models.litellm_model import LitellmModel
-    LITELLM_AVAILABLE = True
-except ImportError:
-    LITELLM_AVAILABLE = False
-    logger.debug("LiteLLM extension not available. Install with: pip install 'openai-agents[litellm]'")
+
+@functools.cache
+def _lazy_litellm():
+    """Import LitellmModel on first use so OpenAI-only runs never load litellm."""
+    try:
+        module = importlib.import_module("agents.extensions.models.litellm_model")
+    except ImportError as e:
+        raise ImportError(
+            "LiteLLM extension not available. Install with: pip install 'openai-agents[litellm]'"
+        ) from e
+    return module.LitellmModel
+
+
+@functools.lru_cache(maxsize=32)
+def _settings_for(temperature: float):
+    """Return the cached ModelSettings for the given temperature.
+
+    The instance is shared between callers and must never be mutated;
+    get_model_settings hands out copies.
+    """
+    return ModelSettings(temperature=temperature)
 
 
 class ModelProvider(Enum):
@@ -118,6 +139,35 @@ PROVIDER_CONFIGS: Dict[str, ModelConfig] = {
     ),
 }
 
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
+class _Settings:
+    """Environment-derived configuration, read once per process."""
+    default_model: str
+    disable_tracing: bool
+    use_chat_completions: bool
+
+
+@functools.cache
+def _settings() -> _Settings:
+    """Read model-related environment variables (call cache_clear() to reload)."""
+    return _Settings(
+        default_model=os.getenv("DEFAULT_MODEL", "gpt-4o"),
+        disable_tracing=os.getenv("DISABLE_TRACING", "false").lower() == "true",
+        use_chat_completions=os.getenv("USE_CHAT_COMPLETIONS_API", "false").lower() == "true",
+    )
+
+
+# Map LiteLLM provider prefixes to our internal provider names
+_LITELLM_PROVIDER_MAPPING = MappingProxyType({
+    "gemini": "google",  # Map gemini to google
+    "anthropic": "anthropic",
+    "groq": "groq",
+    "cohere": "cohere",
+    "ollama": "ollama",
+    "ollama_chat": "ollama",  # Map ollama_chat to ollama
+})
+
 # Convenient shortcuts for common models
 # No hardcoded shortcuts - users should use the flexible LiteLLM format:
 # - OpenAI models: gpt-4o, gpt-4o-mini, o1-preview, etc.
@@ -136,19 +186,21 @@ class ModelManager:
     """Manages model configuration and selection with flexible LiteLLM support."""
     
     def __init__(self):
-        self.current_model = os.getenv("DEFAULT_MODEL", "gpt-4o")
+        self.current_model = _settings().default_model
         self._setup_environment()
     
     def _setup_environment(self):
         """Setup environment based on configuration."""
+        settings = _settings()
+        
         # Disable tracing if specified
-        if os.getenv("DISABLE_TRACING", "false").lower() == "true":
+        if settings.disable_tracing:
             if AGENTS_AVAILABLE:
                 set_tracing_disabled(True)
                 logger.info("Tracing disabled")
         
         # Set default API if using chat completions
-        if os.getenv("USE_CHAT_COMPLETIONS_API", "false").lower() == "true":
+        if settings.use_chat_completions:
             if AGENTS_AVAILABLE:
                 set_default_openai_api("chat_completions")
                 logger.info("Using Chat Completions API by default")
@@ -167,17 +219,7 @@ class ModelManager:
             parts = resolved_name.split("/")
             if len(parts) >= 2:
                 provider = parts[1]  # Return the provider part
-                
-                # Map some provider names to our internal names
-                provider_mapping = {
-                    "gemini": "google",  # Map gemini to google
-                    "anthropic": "anthropic",
-                    "groq": "groq", 
-                    "cohere": "cohere",
-                    "ollama": "ollama",  # Map ollama to ollama
-                    "ollama_chat": "ollama",  # Map ollama_chat to ollama
-                }
-                return provider_mapping.get(provider, provider)
+                return _LITELLM_PROVIDER_MAPPING.get(provider, provider)
             return "litellm"
         
         # Check if it's a direct ollama/ model
@@ -226,10 +268,7 @@ class ModelManager:
             resolved_name.startswith("ollama/") or 
             provider != "openai"):
             
-            if not LITELLM_AVAILABLE:
-                raise ImportError(
-                    "LiteLLM extension not available. Install with: pip install 'openai-agents[litellm]'"
-                )
+            LitellmModel = _lazy_litellm()
             
             # Get API key from parameter or environment (if required)
             if not api_key and config.api_key_env_var:
@@ -264,9 +303,10 @@ class ModelManager:
         
         # For o1 models, temperature is fixed
         if resolved_name.startswith("o1"):
-            return ModelSettings(temperature=1.0)
+            temp = 1.0
         
-        return ModelSettings(temperature=temp)
+        # Copy the cached instance so callers can adjust their settings freely
+        return replace(_settings_for(temp))
     
     def list_available_models(self) -> List[Dict[str, Any]]:
         """List supported providers with example model names."""
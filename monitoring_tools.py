@@ -3,58 +3,104 @@ Monitoring tools for WordPress Plugin Generator agents.
 Provides function tools for performance monitoring and error tracking.
 """
 
-from typing import Dict, Any, Optional, List
+import copy
+import time
+import functools
+from collections import Counter
+from enum import IntEnum
+from itertools import islice
+from operator import attrgetter
+from typing import Dict, Any, Optional, List, Callable, Literal
 from agents import function_tool
 from loguru import logger
 
 from agent_hooks import plugin_hooks
 from context_manager import context_manager
 
+class HealthStatus(IntEnum):
+    """Health status levels used by the health checks."""
+    HEALTHY = 0
+    DEGRADED = 1
+    UNHEALTHY = 2
+    UNKNOWN = 3
+    ERROR = 4
+    
+    @property
+    def label(self) -> str:
+        """Lowercase name used in tool output."""
+        return self.name.lower()
 
-@function_tool
-def get_performance_metrics() -> Dict[str, Any]:
-    """
-    Get performance metrics for all agents.
+
+# Keys and matching HookEvent attributes for the error timeline entries
+_ERROR_TIMELINE_KEYS = ("timestamp", "agent", "tool", "error", "type")
+_error_timeline_fields = attrgetter("timestamp_iso", "agent_name", "tool_name", "error", "hook_type_value")
+
+
+def versioned_cache(ttl: float = 2.0) -> Callable:
+    """Cache a monitoring result until the hooks event log changes or the TTL expires.
     
-    Returns:
-        Dictionary with performance metrics including average execution times,
-        error rates, and system health indicators.
+    Each caller gets its own deep copy, so modifying a result cannot alter the cache.
     """
+    def decorator(func: Callable) -> Callable:
+        cache: Dict[Any, tuple] = {}
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            version = plugin_hooks.version
+            now = time.monotonic()
+            
+            cached = cache.get(key)
+            if cached and cached[0] == version and now - cached[1] < ttl:
+                return copy.deepcopy(cached[2])
+            
+            result = func(*args, **kwargs)
+            cache[key] = (version, now, result)
+            return copy.deepcopy(result)
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+@versioned_cache()
+def _performance_metrics() -> Dict[str, Any]:
+    """Compute performance metrics for all agents."""
     try:
         logger.info("Retrieving performance metrics...")
         
         # Get basic performance data
-        performance_summary = plugin_hooks.get_performance_summary()
-        error_summary = plugin_hooks.get_error_summary()
+        combined = plugin_hooks.get_combined_summary()
+        performance_summary = combined["performance"]
+        error_summary = combined["errors"]
         
         # Calculate system health indicators
         total_runs = sum(metrics["total_runs"] for metrics in performance_summary.values())
         total_errors = error_summary["total_errors"]
         
-        overall_success_rate = ((total_runs - total_errors) / total_runs * 100) if total_runs > 0 else 100
+        overall_success_rate, _ = _compute_rates(total_runs, total_errors)
         
-        # Identify bottlenecks
-        bottlenecks = []
-        for agent_name, metrics in performance_summary.items():
-            if metrics["avg_duration"] > 30:  # Slow agents
-                bottlenecks.append({
-                    "agent": agent_name,
-                    "avg_duration": metrics["avg_duration"],
-                    "issue": "slow_execution"
-                })
+        # Identify bottlenecks from the slow agents tracked by the hooks
+        bottlenecks = [
+            {
+                "agent": agent_name,
+                "avg_duration": performance_summary[agent_name]["avg_duration"],
+                "issue": "slow_execution"
+            }
+            for agent_name in plugin_hooks.slow_agents()
+            if agent_name in performance_summary
+        ]
         
         # Get recent events summary
-        recent_events = plugin_hooks.events[-50:]  # Last 50 events
-        event_types = {}
-        for event in recent_events:
-            event_types[event.hook_type.value] = event_types.get(event.hook_type.value, 0) + 1
+        recent_events = list(islice(reversed(plugin_hooks.events), 50))  # Last 50 events
+        event_types = dict(Counter(event.hook_type_value for event in recent_events))
         
         result = {
             "overall_health": {
                 "success_rate": overall_success_rate,
                 "total_runs": total_runs,
                 "total_errors": total_errors,
-                "status": "healthy" if overall_success_rate > 95 else "degraded" if overall_success_rate > 80 else "unhealthy"
+                "status": _rate_status(overall_success_rate).label
             },
             "agent_performance": performance_summary,
             "error_summary": error_summary,
@@ -76,7 +122,7 @@ def get_performance_metrics() -> Dict[str, Any]:
                 "success_rate": 0,
                 "total_runs": 0,
                 "total_errors": 0,
-                "status": "error"
+                "status": HealthStatus.ERROR.label
             },
             "agent_performance": {},
             "error_summary": {},
@@ -87,21 +133,16 @@ def get_performance_metrics() -> Dict[str, Any]:
         }
 
 
-@function_tool
-def get_session_metrics(session_id: str = "") -> Dict[str, Any]:
-    """
-    Get detailed metrics for a specific session.
+def _session_metrics(session_id: str = "") -> Dict[str, Any]:
+    """Compute detailed metrics for a specific session.
     
-    Args:
-        session_id: Session ID to get metrics for (defaults to current session)
-        
-    Returns:
-        Dictionary with session-specific metrics and timeline
+    Not cached here: the active context can change without a hook event, and
+    the underlying session report is already cached by plugin_hooks.
     """
     try:
         # Get session ID from context if not provided
+        context = context_manager.get_context()
         if not session_id:
-            context = context_manager.get_context()
             if context:
                 session_id = context.session_id
             else:
@@ -116,7 +157,6 @@ def get_session_metrics(session_id: str = "") -> Dict[str, Any]:
             return session_report
         
         # Add context information
-        context = context_manager.get_context()
         if context and context.session_id == session_id:
             session_report["context"] = {
                 "plugin_name": context.plugin_name,
@@ -145,21 +185,15 @@ def get_session_metrics(session_id: str = "") -> Dict[str, Any]:
         }
 
 
-@function_tool
-def get_error_analysis() -> Dict[str, Any]:
-    """
-    Get detailed analysis of errors and failures.
-    
-    Returns:
-        Dictionary with error analysis, patterns, and recommendations
-    """
+@versioned_cache()
+def _error_analysis() -> Dict[str, Any]:
+    """Compute the error and failure analysis."""
     try:
         logger.info("Analyzing errors and failures...")
         
-        # Get all error events
-        error_events = [e for e in plugin_hooks.events if not e.success]
-        
-        if not error_events:
+        # Error counters are maintained incrementally by the hooks, so the
+        # error-free case needs no further work
+        if plugin_hooks.total_error_count == 0:
             return {
                 "total_errors": 0,
                 "error_patterns": {},
@@ -170,53 +204,37 @@ def get_error_analysis() -> Dict[str, Any]:
                 "status": "healthy"
             }
         
+        total_errors = plugin_hooks.total_error_count
+        
         # Analyze error patterns
-        error_patterns = {}
-        agent_errors = {}
-        tool_errors = {}
-        
-        for event in error_events:
-            # Pattern analysis
-            if event.error:
-                error_key = event.error.lower()
-                error_patterns[error_key] = error_patterns.get(error_key, 0) + 1
-            
-            # Agent error tracking
-            agent_errors[event.agent_name] = agent_errors.get(event.agent_name, 0) + 1
-            
-            # Tool error tracking
-            if event.tool_name:
-                tool_errors[event.tool_name] = tool_errors.get(event.tool_name, 0) + 1
+        aggregates = plugin_hooks.error_aggregates()
+        error_patterns = aggregates["patterns"]
+        agent_errors = aggregates["agents"]
+        tool_errors = aggregates["tools"]
         
         # Find most common issues
-        most_common_pattern = max(error_patterns.items(), key=lambda x: x[1]) if error_patterns else None
-        most_problematic_agent = max(agent_errors.items(), key=lambda x: x[1]) if agent_errors else None
-        most_problematic_tool = max(tool_errors.items(), key=lambda x: x[1]) if tool_errors else None
+        most_common_pattern = error_patterns.most_common(1)[0] if error_patterns else None
+        most_problematic_agent = agent_errors.most_common(1)[0] if agent_errors else None
+        most_problematic_tool = tool_errors.most_common(1)[0] if tool_errors else None
         
-        # Create timeline of recent errors
-        recent_errors = sorted(error_events[-20:], key=lambda x: x.timestamp, reverse=True)
+        # Create timeline of recent errors (recorded in order, so newest first when reversed)
+        recent_errors = reversed(plugin_hooks.recent_errors)
         timeline = [
-            {
-                "timestamp": event.timestamp.isoformat(),
-                "agent": event.agent_name,
-                "tool": event.tool_name,
-                "error": event.error,
-                "type": event.hook_type.value
-            }
-            for event in recent_errors
+            dict(zip(_ERROR_TIMELINE_KEYS, fields))
+            for fields in map(_error_timeline_fields, recent_errors)
         ]
         
         result = {
-            "total_errors": len(error_events),
-            "error_patterns": error_patterns,
-            "agent_errors": agent_errors,
-            "tool_errors": tool_errors,
+            "total_errors": total_errors,
+            "error_patterns": dict(error_patterns),
+            "agent_errors": dict(agent_errors),
+            "tool_errors": dict(tool_errors),
             "most_common_issue": most_common_pattern,
             "most_problematic_agent": most_problematic_agent,
             "most_problematic_tool": most_problematic_tool,
             "timeline": timeline,
-            "recommendations": _get_error_recommendations(error_patterns, agent_errors, tool_errors),
-            "status": "critical" if len(error_events) > 20 else "warning" if len(error_events) > 5 else "stable"
+            "recommendations": _get_error_recommendations(most_common_pattern, most_problematic_agent, most_problematic_tool),
+            "status": "critical" if total_errors > 20 else "warning" if total_errors > 5 else "stable"
         }
         
         logger.info(f"Error analysis completed. Status: {result['status']}")
@@ -236,60 +254,65 @@ def get_error_analysis() -> Dict[str, Any]:
         }
 
 
-@function_tool
-def get_health_status() -> Dict[str, Any]:
-    """
-    Get overall system health status.
-    
-    Returns:
-        Dictionary with system health indicators and recommendations
-    """
+@versioned_cache()
+def _health_status() -> Dict[str, Any]:
+    """Compute the overall system health status."""
     try:
         logger.info("Checking system health status...")
         
         # Get basic metrics
-        performance_metrics = plugin_hooks.get_performance_summary()
-        error_summary = plugin_hooks.get_error_summary()
+        combined = plugin_hooks.get_combined_summary()
+        performance_metrics = combined["performance"]
+        error_summary = combined["errors"]
         
         # Calculate health indicators
         total_runs = sum(metrics["total_runs"] for metrics in performance_metrics.values())
         total_errors = error_summary["total_errors"]
         
+        success_rate, error_rate = _compute_rates(total_runs, total_errors)
+        
         # Health checks
         checks = {
-            "agent_performance": _check_agent_performance(performance_metrics),
-            "error_rate": _check_error_rate(total_runs, total_errors),
+            "agent_performance": _check_agent_performance(performance_metrics, plugin_hooks.slow_agents()),
+            "error_rate": _check_error_rate(total_runs, error_rate),
             "system_resources": _check_system_resources(),
             "security_status": _check_security_status()
         }
         
         # Overall health calculation
-        passed_checks = sum(1 for check in checks.values() if check["status"] == "healthy")
+        passed_checks = sum(1 for check in checks.values() if check["status"] == HealthStatus.HEALTHY)
         total_checks = len(checks)
         health_score = (passed_checks / total_checks) * 100
         
-        overall_status = "healthy" if health_score >= 80 else "degraded" if health_score >= 60 else "unhealthy"
+        overall_status = (
+            HealthStatus.HEALTHY if health_score >= 80
+            else HealthStatus.DEGRADED if health_score >= 60
+            else HealthStatus.UNHEALTHY
+        )
         
         result = {
-            "overall_status": overall_status,
+            "overall_status": overall_status.label,
             "health_score": health_score,
-            "checks": checks,
+            "checks": {
+                check_name: {"status": check["status"].label, "message": check["message"]}
+                for check_name, check in checks.items()
+            },
             "summary": {
                 "total_agents": len(performance_metrics),
                 "total_runs": total_runs,
                 "total_errors": total_errors,
-                "success_rate": ((total_runs - total_errors) / total_runs * 100) if total_runs > 0 else 100
+                "success_rate": success_rate
             },
             "recommendations": _get_health_recommendations(checks, overall_status)
         }
         
-        logger.info(f"Health status checked. Overall status: {overall_status} ({health_score:.1f}%)")
+        logger.info(f"Health status checked. Overall status: {overall_status.label} ({health_score:.1f}%)")
         return result
         
     except Exception as e:
         logger.error(f"Failed to check health status: {e}")
         return {
-            "overall_status": "error",
+            "overall_status": HealthStatus.ERROR.label,
             "health_score": 0,
             "checks": {},
             "summary": {},
@@ -298,6 +321,89 @@ def get_health_status() -> Dict[str, Any]:
         }
 
 
+# Report builders behind get_monitoring_report, keyed by report kind
+_MONITORING_REPORTS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "performance": _performance_metrics,
+    "errors": _error_analysis,
+    "health": _health_status,
+}
+
+
+@function_tool
+def get_monitoring_report(
+    kind: Literal["all", "performance", "session", "errors", "health"] = "all",
+    session_id: str = ""
+) -> Dict[str, Any]:
+    """
+    Get one or all monitoring views in a single call.
+    
+    Args:
+        kind: Which report to return: performance, session, errors, health, or all
+        session_id: Session ID for the session report (defaults to current session)
+        
+    Returns:
+        Dictionary with the requested report, or all reports keyed by kind
+    """
+    if kind == "all":
+        return {
+            "performance": _performance_metrics(),
+            "session": _session_metrics(session_id),
+            "errors": _error_analysis(),
+            "health": _health_status()
+        }
+    if kind == "session":
+        return _session_metrics(session_id)
+    return _MONITORING_REPORTS[kind]()
+
+
+@function_tool
+def get_performance_metrics() -> Dict[str, Any]:
+    """
+    Get performance metrics for all agents.
+    
+    Returns:
+        Dictionary with performance metrics including average execution times,
+        error rates, and system health indicators.
+    """
+    return _performance_metrics()
+
+
+@function_tool
+def get_session_metrics(session_id: str = "") -> Dict[str, Any]:
+    """
+    Get detailed metrics for a specific session.
+    
+    Args:
+        session_id: Session ID to get metrics for (defaults to current session)
+        
+    Returns:
+        Dictionary with session-specific metrics and timeline
+    """
+    return _session_metrics(session_id)
+
+
+@function_tool
+def get_error_analysis() -> Dict[str, Any]:
+    """
+    Get detailed analysis of errors and failures.
+    
+    Returns:
+        Dictionary with error analysis, patterns, and recommendations
+    """
+    return _error_analysis()
+
+
+@function_tool
+def get_health_status() -> Dict[str, Any]:
+    """
+    Get overall system health status.
+    
+    Returns:
+        Dictionary with system health indicators and recommendations
+    """
+    return _health_status()
+
+
 def _get_performance_recommendations(performance_summary: Dict, error_summary: Dict, bottlenecks: List) -> List[str]:
     """Generate performance recommendations."""
     recommendations = []
@@ -331,89 +437,100 @@ def _analyze_session_performance(session_report: Dict) -> Dict[str, Any]:
     return analysis
 
 
-def _get_error_recommendations(error_patterns: Dict, agent_errors: Dict, tool_errors: Dict) -> List[str]:
-    """Generate error-based recommendations."""
+def _get_error_recommendations(most_common_pattern: Optional[tuple], most_problematic_agent: Optional[tuple],
+                               most_problematic_tool: Optional[tuple]) -> List[str]:
+    """Generate error-based recommendations from the top (name, count) entries."""
     recommendations = []
     
-    if error_patterns:
-        most_common = max(error_patterns.items(), key=lambda x: x[1])
-        recommendations.append(f"Address most common error pattern: {most_common[0]}")
+    if most_common_pattern:
+        recommendations.append(f"Address most common error pattern: {most_common_pattern[0]}")
     
-    if agent_errors:
-        most_problematic = max(agent_errors.items(), key=lambda x: x[1])
-        recommendations.append(f"Review and fix issues in {most_problematic[0]} agent")
+    if most_problematic_agent:
+        recommendations.append(f"Review and fix issues in {most_problematic_agent[0]} agent")
     
-    if tool_errors:
-        most_problematic = max(tool_errors.items(), key=lambda x: x[1])
-        recommendations.append(f"Investigate problems with {most_problematic[0]} tool")
+    if most_problematic_tool:
+        recommendations.append(f"Investigate problems with {most_problematic_tool[0]} tool")
     
     return recommendations or ["Continue monitoring for error patterns"]
 
 
-def _check_agent_performance(performance_metrics: Dict) -> Dict[str, Any]:
+def _rate_status(success_rate: float) -> HealthStatus:
+    """Map an overall success rate to a health status."""
+    if success_rate > 95:
+        return HealthStatus.HEALTHY
+    if success_rate > 80:
+        return HealthStatus.DEGRADED
+    return HealthStatus.UNHEALTHY
+
+
+def _check_agent_performance(performance_metrics: Dict, slow_agents: List[str]) -> Dict[str, Any]:
     """Check agent performance health."""
     if not performance_metrics:
-        return {"status": "unknown", "message": "No performance data available"}
-    
-    slow_agents = [name for name, metrics in performance_metrics.items() if metrics["avg_duration"] > 30]
+        return {"status": HealthStatus.UNKNOWN, "message": "No performance data available"}
     
     if not slow_agents:
-        return {"status": "healthy", "message": "All agents performing well"}
+        return {"status": HealthStatus.HEALTHY, "message": "All agents performing well"}
     else:
-        return {"status": "degraded", "message": f"Slow agents detected: {', '.join(slow_agents)}"}
+        return {"status": HealthStatus.DEGRADED, "message": f"Slow agents detected: {', '.join(slow_agents)}"}
 
 
-def _check_error_rate(total_runs: int, total_errors: int) -> Dict[str, Any]:
+def _compute_rates(total_runs: int, total_errors: int) -> tuple:
+    """Compute (success_rate, error_rate) percentages from run and error totals."""
+    if total_runs <= 0:
+        return 100, 0.0
+    error_rate = (total_errors / total_runs) * 100
+    return 100 - error_rate, error_rate
+
+
+def _check_error_rate(total_runs: int, error_rate: float) -> Dict[str, Any]:
     """Check error rate health."""
     if total_runs == 0:
-        return {"status": "unknown", "message": "No operations recorded"}
-    
-    error_rate = (total_errors / total_runs) * 100
+        return {"status": HealthStatus.UNKNOWN, "message": "No operations recorded"}
     
     if error_rate < 5:
-        return {"status": "healthy", "message": f"Low error rate: {error_rate:.1f}%"}
+        return {"status": HealthStatus.HEALTHY, "message": f"Low error rate: {error_rate:.1f}%"}
     elif error_rate < 20:
-        return {"status": "degraded", "message": f"Moderate error rate: {error_rate:.1f}%"}
+        return {"status": HealthStatus.DEGRADED, "message": f"Moderate error rate: {error_rate:.1f}%"}
     else:
-        return {"status": "unhealthy", "message": f"High error rate: {error_rate:.1f}%"}
+        return {"status": HealthStatus.UNHEALTHY, "message": f"High error rate: {error_rate:.1f}%"}
 
 
 def _check_system_resources() -> Dict[str, Any]:
     """Check system resources (simplified)."""
     # This is a simplified check - in production, you'd check actual system resources
-    return {"status": "healthy", "message": "System resources appear adequate"}
+    return {"status": HealthStatus.HEALTHY, "message": "System resources appear adequate"}
 
 
 def _check_security_status() -> Dict[str, Any]:
     """Check security status."""
-    # Count security-related events
-    security_events = [e for e in plugin_hooks.events if e.hook_type.value == "security_check"]
-    security_violations = [e for e in security_events if not e.success]
+    # Security event counts are maintained incrementally by the hooks
+    security_checks = plugin_hooks.security_check_count
+    security_violations = plugin_hooks.security_violation_count
     
-    if not security_events:
-        return {"status": "unknown", "message": "No security checks performed"}
+    if not security_checks:
+        return {"status": HealthStatus.UNKNOWN, "message": "No security checks performed"}
     
-    violation_rate = (len(security_violations) / len(security_events)) * 100
+    violation_rate = (security_violations / security_checks) * 100
     
     if violation_rate == 0:
-        return {"status": "healthy", "message": "No security violations detected"}
+        return {"status": HealthStatus.HEALTHY, "message": "No security violations detected"}
     elif violation_rate < 10:
-        return {"status": "degraded", "message": f"Some security violations: {violation_rate:.1f}%"}
+        return {"status": HealthStatus.DEGRADED, "message": f"Some security violations: {violation_rate:.1f}%"}
     else:
-        return {"status": "unhealthy", "message": f"High security violation rate: {violation_rate:.1f}%"}
+        return {"status": HealthStatus.UNHEALTHY, "message": f"High security violation rate: {violation_rate:.1f}%"}
 
 
-def _get_health_recommendations(checks: Dict, overall_status: str) -> List[str]:
+def _get_health_recommendations(checks: Dict, overall_status: HealthStatus) -> List[str]:
     """Generate health-based recommendations."""
-    recommendations = []
-    
-    for check_name, check_result in checks.items():
-        if check_result["status"] != "healthy":
-            recommendations.append(f"Address {check_name}: {check_result['message']}")
+    recommendations = [
+        f"Address {check_name}: {check_result['message']}"
+        for check_name, check_result in checks.items()
+        if check_result["status"] != HealthStatus.HEALTHY
+    ]
     
-    if overall_status == "unhealthy":
+    if overall_status == HealthStatus.UNHEALTHY:
         recommendations.append("System requires immediate attention")
-    elif overall_status == "degraded":
+    elif overall_status == HealthStatus.DEGRADED:
         recommendations.append("Monitor system closely and address issues")
     
     return recommendations or ["System is healthy - continue monitoring"]
\ No newline at end of file
@@ -4,8 +4,12 @@ Implements input/output validation and security checks following OpenAI Agents P
 """
 
 import re
+import sys
 import json
 import hashlib
+import dataclasses
+from collections import OrderedDict
+from threading import Lock
 from typing import Dict, Any, Optional, List, Union
 from dataclasses import dataclass
 from enum import Enum
@@ -13,6 +17,107 @@ from loguru import logger
 
 from context_manager import PluginGenerationContext
 
+# Number of distinct code blobs whose scan results are kept
+SCAN_CACHE_SIZE = 512
+
+# dataclass(slots=True) is only available from Python 3.10
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+# Dangerous PHP functions and patterns
+DANGEROUS_FUNCTIONS = frozenset({
+    'eval', 'exec', 'system', 'shell_exec', 'passthru', 'proc_open',
+    'popen', 'file_get_contents', 'file_put_contents', 'fopen', 'fwrite',
+    'unlink', 'rmdir', 'mkdir', 'chmod', 'chown', 'curl_exec'
+})
+
+# SQL injection patterns. The superglobal index is matched up to its first
+# closing bracket only, so a line full of ']' cannot make the search quadratic
+SQL_INJECTION_PATTERNS = (
+    r'\$_(?:GET|POST|REQUEST|COOKIE)\[[^\]\n]*\].*?(?:SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER)',
+    r'mysql_query\s*\(\s*["\'].*?\$',
+    r'query\s*\(\s*["\'].*?\$',
+)
+
+# WordPress security patterns
+WORDPRESS_SECURITY_PATTERNS = {
+    'missing_abspath': r'^<\?php\s*$',
+    'direct_file_access': r'\A(?![\s\S]*defined\s*\(\s*["\']ABSPATH["\'])',
+    'missing_nonce': r'(?:wp_ajax_|admin_post_).*?(?<!wp_verify_nonce)',
+    'unsafe_output': r'echo\s+\$_(?:GET|POST|REQUEST|COOKIE)',
+    'missing_capability': r'(?:add_menu_page|add_submenu_page).*?(?<!current_user_can)',
+}
+
+# WordPress checks reported as critical; the rest are high severity
+CRITICAL_WORDPRESS_CHECKS = frozenset({'missing_abspath', 'missing_nonce'})
+
+# Suggested fix for each WordPress check
+WORDPRESS_SECURITY_FIXES = {
+    'missing_abspath': "Add 'if (!defined('ABSPATH')) exit;' at the top of PHP files",
+    'direct_file_access': "Use proper WordPress security checks",
+    'missing_nonce': "Add wp_verify_nonce() verification for form submissions",
+    'unsafe_output': "Use WordPress escaping functions like esc_html() or esc_attr()",
+    'missing_capability': "Add current_user_can() capability checks",
+}
+
+# Prohibited content terms, matched case-insensitively as plain substrings
+PROHIBITED_TERMS = (
+    'malware', 'backdoor', 'exploit', 'hack',
+    'phishing', 'spam', 'virus', 'trojan',
+)
+PROHIBITED_CONTENT = tuple(rf'(?i){term}' for term in PROHIBITED_TERMS)
+
+# Security bypass request patterns
+ADMIN_BYPASS_PATTERNS = (
+    r'(?i)bypass.*(?:admin|security|authentication)',
+    r'(?i)disable.*(?:security|validation|checks)',
+    r'(?i)backdoor.*(?:access|login|admin)',
+    r'(?i)exploit.*(?:vulnerability|weakness)',
+)
+
+# Error indications in agent output
+ERROR_PATTERNS = (
+    r'(?i)error.*occurred',
+    r'(?i)failed.*to',
+    r'(?i)unable.*to',
+    r'(?i)invalid.*input',
+)
+
+
+
+def _casefolded(pattern: str) -> str:
+    """Lowercase the literal letters of an ASCII pattern, leaving escapes and (?i) alone."""
+    return re.sub(r'\(\?i\)|\\.|[A-Z]', lambda m: m.group() if len(m.group()) > 1 else m.group().lower(), pattern)
+
+
+# Compiled once at import; the checks run on each agent turn. Every rule is
+# ASCII, so rather than matching with re.IGNORECASE the checks lowercase
+# the text once and run case-sensitive lowercase patterns over it
+_DANGEROUS_FN_RE = re.compile(r'\b(' + '|'.join(sorted(DANGEROUS_FUNCTIONS)) + r')\s*\(')
+_SQL_INJECTION_RES = tuple(re.compile(_casefolded(p)) for p in SQL_INJECTION_PATTERNS)
+
+# The WordPress checks that match at a position start with distinct literals,
+# so one alternation finds every one of them in a single pass over the code.
+# direct_file_access is a whole-file assertion anchored at \A and runs on its own
+_WORDPRESS_SECURITY_RE = re.compile(
+    '|'.join(
+        f'(?P<{name}>{_casefolded(pattern)})' for name, pattern in WORDPRESS_SECURITY_PATTERNS.items()
+        if name != 'direct_file_access'
+    )
+)
+_DIRECT_FILE_ACCESS_RE = re.compile(_casefolded(WORDPRESS_SECURITY_PATTERNS['direct_file_access']))
+_ADMIN_BYPASS_RES = tuple(re.compile(p.replace('(?i)', '', 1)) for p in ADMIN_BYPASS_PATTERNS)
+
+# Literal word each bypass pattern starts with, used as a cheap prefilter
+_ADMIN_BYPASS_KEYWORDS = ('bypass', 'disable', 'backdoor', 'exploit')
+
+# Every WordPress check needs one of these markers to be relevant,
+# so text without any of them (reports, CSS, JS) skips the whole suite
+_PHP_MARKER_RE = re.compile(
+    r'<\?php|\$_(?:get|post|request|cookie)|wpdb|add_(?:menu|submenu)_page|wp_ajax_|admin_post_'
+)
+_ERROR_RES = tuple(re.compile(p.replace('(?i)', '', 1)) for p in ERROR_PATTERNS)
+
 
 class GuardrailSeverity(Enum):
     """Severity levels for guardrail violations."""
@@ -31,7 +136,7 @@ class GuardrailCategory(Enum):
     PLUGIN_COMPLIANCE = "plugin_compliance"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class GuardrailViolation:
     """Represents a guardrail violation."""
     category: GuardrailCategory
@@ -57,40 +162,18 @@ class SecurityGuardrails:
     def __init__(self):
         self.violations: List[GuardrailViolation] = []
         
-        # Dangerous PHP functions and patterns
-        self.dangerous_functions = {
-            'eval', 'exec', 'system', 'shell_exec', 'passthru', 'proc_open',
-            'popen', 'file_get_contents', 'file_put_contents', 'fopen', 'fwrite',
-            'unlink', 'rmdir', 'mkdir', 'chmod', 'chown', 'curl_exec'
-        }
-        
-        # SQL injection patterns
-        self.sql_injection_patterns = [
-            r'\$_(?:GET|POST|REQUEST|COOKIE)\[.*?\].*?(?:SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER)',
-            r'mysql_query\s*\(\s*["\'].*?\$',
-            r'query\s*\(\s*["\'].*?\$',
-        ]
-        
-        # WordPress security patterns
-        self.wordpress_security_patterns = {
-            'missing_abspath': r'^<\?php\s*$',
-            'direct_file_access': r'(?<!if\s*\(\s*!\s*defined\s*\(\s*["\']ABSPATH["\'])',
-            'missing_nonce': r'(?:wp_ajax_|admin_post_).*?(?<!wp_verify_nonce)',
-            'unsafe_output': r'echo\s+\$_(?:GET|POST|REQUEST|COOKIE)',
-            'missing_capability': r'(?:add_menu_page|add_submenu_page).*?(?<!current_user_can)',
-        }
-        
-        # Prohibited content patterns
-        self.prohibited_content = [
-            r'(?i)malware',
-            r'(?i)backdoor',
-            r'(?i)exploit',
-            r'(?i)hack',
-            r'(?i)phishing',
-            r'(?i)spam',
-            r'(?i)virus',
-            r'(?i)trojan',
-        ]
+        # Code scan results keyed by content digest, oldest first
+        self._scan_cache: "OrderedDict[bytes, List[GuardrailViolation]]" = OrderedDict()
+        self._scan_cache_lock = Lock()
+        
+        # Rule tables are module constants; instances only share references
+        self.dangerous_functions = DANGEROUS_FUNCTIONS
+        self.sql_injection_patterns = SQL_INJECTION_PATTERNS
+        self.wordpress_security_patterns = WORDPRESS_SECURITY_PATTERNS
+        self.prohibited_terms = PROHIBITED_TERMS
+        self.prohibited_content = PROHIBITED_CONTENT
+        self.admin_bypass_patterns = ADMIN_BYPASS_PATTERNS
+        self.error_patterns = ERROR_PATTERNS
     
     def validate_input(self, user_input: str, context: Optional[PluginGenerationContext] = None) -> List[GuardrailViolation]:
         """Validate user input for security issues."""
@@ -131,8 +214,9 @@ class SecurityGuardrails:
         """Check for malicious content patterns."""
         violations = []
         
-        for pattern in self.prohibited_content:
-            if re.search(pattern, content, re.IGNORECASE):
+        lowered = content.lower()
+        for term, pattern in zip(self.prohibited_terms, self.prohibited_content):
+            if term in lowered:
                 violations.append(GuardrailViolation(
                     category=GuardrailCategory.CONTENT_FILTER,
                     severity=GuardrailSeverity.CRITICAL,
@@ -147,16 +231,11 @@ class SecurityGuardrails:
         """Check for inappropriate plugin requests."""
         violations = []
         
-        # Check for admin/security bypass requests
-        admin_bypass_patterns = [
-            r'(?i)bypass.*(?:admin|security|authentication)',
-            r'(?i)disable.*(?:security|validation|checks)',
-            r'(?i)backdoor.*(?:access|login|admin)',
-            r'(?i)exploit.*(?:vulnerability|weakness)',
-        ]
-        
-        for pattern in admin_bypass_patterns:
-            if re.search(pattern, content):
+        # Check for admin/security bypass requests, skipping patterns whose
+        # leading keyword does not appear at all
+        lowered = content.lower()
+        for keyword, regex, pattern in zip(_ADMIN_BYPASS_KEYWORDS, _ADMIN_BYPASS_RES, ADMIN_BYPASS_PATTERNS):
+            if keyword in lowered and regex.search(lowered):
                 violations.append(GuardrailViolation(
                     category=GuardrailCategory.CONTENT_FILTER,
                     severity=GuardrailSeverity.CRITICAL,
@@ -172,22 +251,24 @@ class SecurityGuardrails:
         violations = []
         
         # Check length limits
-        if len(content) > 10000:
+        content_length = len(content)
+        if content_length > 10000:
             violations.append(GuardrailViolation(
                 category=GuardrailCategory.INPUT_VALIDATION,
                 severity=GuardrailSeverity.MEDIUM,
                 message="Input exceeds maximum length limit",
-                details=f"Input length: {len(content)} characters (max: 10000)",
+                details=f"Input length: {content_length} characters (max: 10000)",
                 suggested_fix="Reduce input length or break into multiple requests"
             ))
         
         # Check for excessive complexity
-        if content.count('\n') > 100:
+        line_count = content.count('\n')
+        if line_count > 100:
             violations.append(GuardrailViolation(
                 category=GuardrailCategory.INPUT_VALIDATION,
                 severity=GuardrailSeverity.LOW,
                 message="Input has excessive complexity",
-                details=f"Input contains {content.count(chr(10))} lines",
+                details=f"Input contains {line_count} lines",
                 suggested_fix="Simplify the request or break into smaller parts"
             ))
         
@@ -220,24 +301,42 @@ class SecurityGuardrails:
         return violations
     
     def _check_code_security(self, code: str) -> List[GuardrailViolation]:
-        """Check code for security vulnerabilities."""
+        """Check code for security vulnerabilities, reusing results for unchanged code."""
+        key = hashlib.blake2b(code.encode('utf-8'), digest_size=16).digest()
+        with self._scan_cache_lock:
+            cached = self._scan_cache.get(key)
+            if cached is not None:
+                self._scan_cache.move_to_end(key)
+        
+        if cached is None:
+            cached = self._scan_code(code)
+            with self._scan_cache_lock:
+                self._scan_cache[key] = cached
+                if len(self._scan_cache) > SCAN_CACHE_SIZE:
+                    self._scan_cache.popitem(last=False)
+        
+        # Callers stamp file paths onto the violations, so hand out copies
+        return [dataclasses.replace(v) for v in cached]
+    
+    def _scan_code(self, code: str) -> List[GuardrailViolation]:
+        """Run every code security check over the given code."""
         violations = []
+        lowered = code.lower()
         
-        # Check for dangerous PHP functions
-        for func in self.dangerous_functions:
-            pattern = rf'\b{func}\s*\('
-            if re.search(pattern, code, re.IGNORECASE):
-                violations.append(GuardrailViolation(
-                    category=GuardrailCategory.SECURITY_SCAN,
-                    severity=GuardrailSeverity.HIGH,
-                    message=f"Dangerous PHP function detected: {func}",
-                    details=f"Function '{func}' can be used for malicious purposes",
-                    suggested_fix=f"Replace '{func}' with safer WordPress alternatives"
-                ))
+        # Check for dangerous PHP functions in one pass, reporting each function once
+        found_functions = dict.fromkeys(m.group(1) for m in _DANGEROUS_FN_RE.finditer(lowered))
+        for func in found_functions:
+            violations.append(GuardrailViolation(
+                category=GuardrailCategory.SECURITY_SCAN,
+                severity=GuardrailSeverity.HIGH,
+                message=f"Dangerous PHP function detected: {func}",
+                details=f"Function '{func}' can be used for malicious purposes",
+                suggested_fix=f"Replace '{func}' with safer WordPress alternatives"
+            ))
         
         # Check for SQL injection patterns
-        for pattern in self.sql_injection_patterns:
-            if re.search(pattern, code, re.IGNORECASE):
+        for regex, pattern in zip(_SQL_INJECTION_RES, SQL_INJECTION_PATTERNS):
+            if regex.search(lowered):
                 violations.append(GuardrailViolation(
                     category=GuardrailCategory.SECURITY_SCAN,
                     severity=GuardrailSeverity.CRITICAL,
@@ -246,10 +345,19 @@ class SecurityGuardrails:
                     suggested_fix="Use WordPress $wpdb prepared statements"
                 ))
         
-        # Check WordPress security patterns
-        for check_name, pattern in self.wordpress_security_patterns.items():
-            if re.search(pattern, code, re.IGNORECASE):
-                severity = GuardrailSeverity.CRITICAL if check_name in ['missing_abspath', 'missing_nonce'] else GuardrailSeverity.HIGH
+        # Check WordPress security patterns, only on code that looks like PHP
+        failed_checks = set()
+        if _PHP_MARKER_RE.search(lowered):
+            failed_checks.update(m.lastgroup for m in _WORDPRESS_SECURITY_RE.finditer(lowered))
+            # direct_file_access asserts something about a whole PHP file, so it only
+            # applies to text that opens a PHP block, and a file that is nothing but
+            # the open tag is already reported as missing_abspath
+            if ('<?php' in lowered and 'missing_abspath' not in failed_checks
+                    and _DIRECT_FILE_ACCESS_RE.match(lowered)):
+                failed_checks.add('direct_file_access')
+        for check_name, pattern in WORDPRESS_SECURITY_PATTERNS.items():
+            if check_name in failed_checks:
+                severity = GuardrailSeverity.CRITICAL if check_name in CRITICAL_WORDPRESS_CHECKS else GuardrailSeverity.HIGH
                 violations.append(GuardrailViolation(
                     category=GuardrailCategory.SECURITY_SCAN,
                     severity=severity,
@@ -312,15 +420,9 @@ class SecurityGuardrails:
             ))
         
         # Check for error messages in output
-        error_patterns = [
-            r'(?i)error.*occurred',
-            r'(?i)failed.*to',
-            r'(?i)unable.*to',
-            r'(?i)invalid.*input',
-        ]
-        
-        for pattern in error_patterns:
-            if re.search(pattern, output):
+        lowered = output.lower()
+        for regex, pattern in zip(_ERROR_RES, ERROR_PATTERNS):
+            if regex.search(lowered):
                 violations.append(GuardrailViolation(
                     category=GuardrailCategory.OUTPUT_VALIDATION,
                     severity=GuardrailSeverity.MEDIUM,
@@ -333,20 +435,13 @@ class SecurityGuardrails:
     
     def _get_security_fix_suggestion(self, check_name: str) -> str:
         """Get security fix suggestion for a specific check."""
-        fixes = {
-            'missing_abspath': "Add 'if (!defined('ABSPATH')) exit;' at the top of PHP files",
-            'direct_file_access': "Use proper WordPress security checks",
-            'missing_nonce': "Add wp_verify_nonce() verification for form submissions",
-            'unsafe_output': "Use WordPress escaping functions like esc_html() or esc_attr()",
-            'missing_capability': "Add current_user_can() capability checks",
-        }
-        return fixes.get(check_name, "Review WordPress security best practices")
+        return WORDPRESS_SECURITY_FIXES.get(check_name, "Review WordPress security best practices")
     
     def check_and_raise_critical(self, violations: List[GuardrailViolation]):
         """Check violations and raise exception for critical issues."""
-        critical_violations = [v for v in violations if v.severity == GuardrailSeverity.CRITICAL]
-        if critical_violations:
-            raise GuardrailTripwireTriggered(critical_violations[0])
+        for violation in violations:
+            if violation.severity is GuardrailSeverity.CRITICAL:
+                raise GuardrailTripwireTriggered(violation)
     
     def get_violations_summary(self) -> Dict[str, int]:
         """Get summary of violations by severity."""
@@ -3,6 +3,8 @@ Security tools for WordPress Plugin Generator agents.
 Provides function tools for security validation and scanning.
 """
 
+import functools
+import json
 from typing import List, Dict, Any, Optional
 from agents import function_tool
 from loguru import logger
@@ -26,7 +28,6 @@ def validate_plugin_security(plugin_files: str) -> Dict[str, Any]:
         logger.info("Starting plugin security validation...")
         
         # Parse JSON input
-        import json
         try:
             files_data = json.loads(plugin_files)
         except json.JSONDecodeError:
@@ -35,51 +36,54 @@ def validate_plugin_security(plugin_files: str) -> Dict[str, Any]:
         # Run security scanner
         violations = plugin_security_scanner(files_data)
         
-        # Update context with security results
+        # Count violations by severity and build the detailed report and
+        # context issues in a single pass
         context = context_manager.get_context()
-        if context:
-            context.compliance_issues.extend([
-                {
-                    "type": "security",
-                    "severity": v.severity.value,
-                    "message": v.message,
-                    "file": v.file_path,
-                    "category": v.category.value,
-                    "fix_suggestion": v.suggested_fix
-                }
-                for v in violations
-            ])
-            context_manager.update_context(context.session_id)
-        
-        # Categorize violations by severity
-        critical_violations = [v for v in violations if v.severity.value == "critical"]
-        high_violations = [v for v in violations if v.severity.value == "high"]
-        medium_violations = [v for v in violations if v.severity.value == "medium"]
-        low_violations = [v for v in violations if v.severity.value == "low"]
-        
-        # Create summary
-        summary = {
-            "total_violations": len(violations),
-            "critical_count": len(critical_violations),
-            "high_count": len(high_violations),
-            "medium_count": len(medium_violations),
-            "low_count": len(low_violations),
-            "security_score": max(0, 100 - (len(critical_violations) * 25 + len(high_violations) * 15 + len(medium_violations) * 10 + len(low_violations) * 5)),
-            "passed": len(critical_violations) == 0 and len(high_violations) == 0
-        }
-        
-        # Create detailed report
+        severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
         detailed_violations = []
+        security_issues = []
         for violation in violations:
+            severity = violation.severity.value
+            category = violation.category.value
+            severity_counts[severity] += 1
             detailed_violations.append({
-                "severity": violation.severity.value,
-                "category": violation.category.value,
+                "severity": severity,
+                "category": category,
                 "message": violation.message,
                 "file_path": violation.file_path,
                 "line_number": violation.line_number,
                 "details": violation.details,
                 "suggested_fix": violation.suggested_fix
             })
+            if context:
+                security_issues.append({
+                    "type": "security",
+                    "severity": severity,
+                    "message": violation.message,
+                    "file": violation.file_path,
+                    "category": category,
+                    "fix_suggestion": violation.suggested_fix
+                })
+        
+        # Update context with security results
+        if context:
+            context.compliance_issues.extend(security_issues)
+            context_manager.update_context(context.session_id)
+        
+        # Create summary
+        critical_count = severity_counts["critical"]
+        high_count = severity_counts["high"]
+        medium_count = severity_counts["medium"]
+        low_count = severity_counts["low"]
+        summary = {
+            "total_violations": len(violations),
+            "critical_count": critical_count,
+            "high_count": high_count,
+            "medium_count": medium_count,
+            "low_count": low_count,
+            "security_score": max(0, 100 - (critical_count * 25 + high_count * 15 + medium_count * 10 + low_count * 5)),
+            "passed": critical_count == 0 and high_count == 0
+        }
         
         result = {
             "summary": summary,
@@ -136,7 +140,7 @@ def check_wordpress_security_compliance(plugin_content: str, plugin_name: str) -
         }
         
         # Calculate compliance score
-        passed_checks = sum(1 for check in wordpress_checks.values() if check)
+        passed_checks = sum(wordpress_checks.values())
         total_checks = len(wordpress_checks)
         compliance_score = (passed_checks / total_checks) * 100
         
@@ -195,10 +199,22 @@ def scan_for_malicious_patterns(content: str, content_type: str = "code") -> Dic
         if content_type == "code":
             violations.extend(security_guardrails._check_code_security(content))
         
-        # Categorize threats
-        critical_threats = [v for v in violations if v.severity.value == "critical"]
-        high_threats = [v for v in violations if v.severity.value == "high"]
-        medium_threats = [v for v in violations if v.severity.value == "medium"]
+        # Categorize threats and build their report in a single pass
+        severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+        threats_detected = []
+        for violation in violations:
+            severity = violation.severity.value
+            severity_counts[severity] += 1
+            threats_detected.append({
+                "severity": severity,
+                "category": violation.category.value,
+                "message": violation.message,
+                "details": violation.details,
+                "suggested_fix": violation.suggested_fix
+            })
+        critical_threats = severity_counts["critical"]
+        high_threats = severity_counts["high"]
+        medium_threats = severity_counts["medium"]
         
         threat_level = "CRITICAL" if critical_threats else "HIGH" if high_threats else "MEDIUM" if medium_threats else "LOW"
         
@@ -206,20 +222,11 @@ def scan_for_malicious_patterns(content: str, content_type: str = "code") -> Dic
             "content_type": content_type,
             "threat_level": threat_level,
             "total_threats": len(violations),
-            "critical_threats": len(critical_threats),
-            "high_threats": len(high_threats),
-            "medium_threats": len(medium_threats),
-            "threats_detected": [
-                {
-                    "severity": v.severity.value,
-                    "category": v.category.value,
-                    "message": v.message,
-                    "details": v.details,
-                    "suggested_fix": v.suggested_fix
-                }
-                for v in violations
-            ],
-            "safe_to_proceed": len(critical_threats) == 0 and len(high_threats) == 0
+            "critical_threats": critical_threats,
+            "high_threats": high_threats,
+            "medium_threats": medium_threats,
+            "threats_detected": threats_detected,
+            "safe_to_proceed": critical_threats == 0 and high_threats == 0
         }
         
         logger.info(f"Malicious pattern scan completed. Threat level: {threat_level}")
@@ -242,28 +249,29 @@ def scan_for_malicious_patterns(content: str, content_type: str = "code") -> Dic
 
 def _get_security_recommendations(violations: List[GuardrailViolation]) -> List[str]:
     """Generate security recommendations based on violations."""
+    categories = frozenset(violation.category.value for violation in violations)
+    return list(_security_recommendations_for(categories))
+
+
+@functools.lru_cache(maxsize=64)
+def _security_recommendations_for(categories: frozenset) -> tuple:
+    """Build the security recommendations for a set of violation categories."""
     recommendations = []
     
-    # Count violations by category
-    categories = {}
-    for violation in violations:
-        category = violation.category.value
-        categories[category] = categories.get(category, 0) + 1
-    
     # Generate recommendations
-    if categories.get("security_scan", 0) > 0:
+    if "security_scan" in categories:
         recommendations.append("Review and fix security vulnerabilities in the code")
         recommendations.append("Use WordPress security best practices and APIs")
     
-    if categories.get("content_filter", 0) > 0:
+    if "content_filter" in categories:
         recommendations.append("Remove or modify prohibited content")
         recommendations.append("Ensure plugin purpose is legitimate and helpful")
     
-    if categories.get("input_validation", 0) > 0:
+    if "input_validation" in categories:
         recommendations.append("Simplify and clarify input requirements")
         recommendations.append("Follow input format guidelines")
     
-    if categories.get("output_validation", 0) > 0:
+    if "output_validation" in categories:
         recommendations.append("Regenerate output with better specifications")
         recommendations.append("Check for underlying generation issues")
     
@@ -271,34 +279,30 @@ def _get_security_recommendations(violations: List[GuardrailViolation]) -> List[
     recommendations.append("Test the plugin thoroughly before deployment")
     recommendations.append("Follow WordPress Plugin Review Guidelines")
     
-    return recommendations
+    return tuple(recommendations)
+
+
+# Recommendation for each WordPress compliance check that did not pass
+_COMPLIANCE_RECOMMENDATIONS = {
+    "abspath_check": "Add ABSPATH security check to prevent direct file access",
+    "nonce_usage": "Implement nonce verification for form submissions and AJAX calls",
+    "capability_checks": "Add capability checks for administrative functions",
+    "input_sanitization": "Implement proper input sanitization and output escaping",
+    "prepared_statements": "Use prepared statements for database queries",
+    "no_direct_access": "Avoid direct access to superglobals without proper validation",
+}
 
 
 def _get_wordpress_compliance_recommendations(checks: Dict[str, bool], violations: List[GuardrailViolation]) -> List[str]:
     """Generate WordPress compliance recommendations."""
-    recommendations = []
-    
-    if not checks.get("abspath_check", False):
-        recommendations.append("Add ABSPATH security check to prevent direct file access")
-    
-    if not checks.get("nonce_usage", False):
-        recommendations.append("Implement nonce verification for form submissions and AJAX calls")
-    
-    if not checks.get("capability_checks", False):
-        recommendations.append("Add capability checks for administrative functions")
-    
-    if not checks.get("input_sanitization", False):
-        recommendations.append("Implement proper input sanitization and output escaping")
-    
-    if not checks.get("prepared_statements", False):
-        recommendations.append("Use prepared statements for database queries")
-    
-    if not checks.get("no_direct_access", False):
-        recommendations.append("Avoid direct access to superglobals without proper validation")
-    
-    # Add violation-specific recommendations
-    for violation in violations:
-        if violation.suggested_fix:
-            recommendations.append(violation.suggested_fix)
-    
-    return list(set(recommendations))  # Remove duplicates
\ No newline at end of file
+    failed_checks = frozenset(name for name in _COMPLIANCE_RECOMMENDATIONS if not checks.get(name, False))
+    suggested_fixes = frozenset(violation.suggested_fix for violation in violations if violation.suggested_fix)
+    return list(_compliance_recommendations_for(failed_checks, suggested_fixes))
+
+
+@functools.lru_cache(maxsize=512)
+def _compliance_recommendations_for(failed_checks: frozenset, suggested_fixes: frozenset) -> tuple:
+    """Build the deduplicated compliance recommendations for failed checks and violation fixes."""
+    recommendations = {_COMPLIANCE_RECOMMENDATIONS[name] for name in failed_checks}
+    recommendations.update(suggested_fixes)
+    return tuple(recommendations)
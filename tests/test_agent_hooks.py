@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the parent directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent_hooks import PluginGeneratorHooks, HookEvent, HookType
+
+class TestEventEviction(unittest.TestCase):
+
+    @patch('agent_hooks.MAX_EVENTS', 5)
+    def test_evicted_errors_leave_aggregates(self):
+        hooks = PluginGeneratorHooks()
+        for _ in range(3):
+            hooks._record_event(HookEvent(HookType.TOOL_END, "Agent", tool_name="write_file", error="Boom", success=False))
+        hooks._record_event(HookEvent(HookType.SECURITY_CHECK, "Agent", success=False))
+        for _ in range(5):
+            hooks._record_event(HookEvent(HookType.TOOL_END, "Agent"))
+
+        self.assertEqual(len(hooks.events), 5)
+        self.assertEqual(hooks.total_error_count, 0)
+        self.assertEqual(hooks.security_check_count, 0)
+        self.assertEqual(hooks.security_violation_count, 0)
+        self.assertEqual(dict(hooks._error_pattern_counter), {})
+        self.assertEqual(dict(hooks._tool_error_counter), {})
+        self.assertEqual(len(hooks.recent_errors), 0)
+
+    @patch('agent_hooks.MAX_EVENTS', 5)
+    def test_aggregates_match_rebuild_after_eviction(self):
+        hooks = PluginGeneratorHooks()
+        for i in range(12):
+            hooks._record_event(HookEvent(HookType.TOOL_END, "Agent", error=f"err {i % 2}", success=i % 3 != 0))
+        before = (hooks.total_error_count, dict(hooks._error_pattern_counter), list(hooks.recent_errors))
+
+        hooks.clear_old_events()
+        after = (hooks.total_error_count, dict(hooks._error_pattern_counter), list(hooks.recent_errors))
+        self.assertEqual(before, after)
+
+class TestSessionReport(unittest.TestCase):
+
+    @patch('agent_hooks.MAX_EVENTS', 3)
+    def test_report_drops_evicted_events(self):
+        hooks = PluginGeneratorHooks()
+        for _ in range(3):
+            hooks._record_event(HookEvent(HookType.TOOL_END, "Agent", metadata={"session_id": "s1"}))
+        self.assertEqual(hooks.get_session_report("s1")["total_events"], 3)
+
+        hooks._record_event(HookEvent(HookType.TOOL_END, "Agent", metadata={"session_id": "s2"}))
+        self.assertEqual(hooks.get_session_report("s1")["total_events"], 2)
+
+    def test_report_copies_are_independent(self):
+        hooks = PluginGeneratorHooks()
+        hooks._record_event(HookEvent(HookType.TOOL_END, "Agent", metadata={"session_id": "s1"}))
+        hooks.get_session_report("s1")["timeline"].clear()
+        self.assertEqual(len(hooks.get_session_report("s1")["timeline"]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
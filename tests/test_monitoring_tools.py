@@ -0,0 +1,38 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the parent directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agent_hooks import plugin_hooks, HookEvent, HookType
+import monitoring_tools
+
+class TestVersionedCache(unittest.TestCase):
+
+    def setUp(self):
+        monitoring_tools._performance_metrics.cache_clear()
+        self.addCleanup(monitoring_tools._performance_metrics.cache_clear)
+
+    def test_cached_until_new_event(self):
+        with patch.object(plugin_hooks, 'get_combined_summary', wraps=plugin_hooks.get_combined_summary) as mock_summary:
+            first = monitoring_tools._performance_metrics()
+            monitoring_tools._performance_metrics()
+            self.assertEqual(mock_summary.call_count, 1)
+
+            plugin_hooks._record_event(HookEvent(HookType.TOOL_END, "Agent"))
+            second = monitoring_tools._performance_metrics()
+            self.assertEqual(mock_summary.call_count, 2)
+
+        self.assertEqual(
+            second["recent_activity"]["total_events"],
+            min(first["recent_activity"]["total_events"] + 1, 50)
+        )
+
+    def test_callers_get_independent_copies(self):
+        monitoring_tools._performance_metrics()["recommendations"].append("mutated")
+        self.assertNotIn("mutated", monitoring_tools._performance_metrics()["recommendations"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch, AsyncMock, MagicMock
+from types import SimpleNamespace
+import asyncio
+import json
+import sys
+import os
+
+# Add the parent directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents import Agent
+from context_manager import PluginGenerationContext
+import plugin_agents
+
+class TestManagerSubAgentTools(unittest.TestCase):
+
+    def setUp(self):
+        self.context = PluginGenerationContext(plugin_name="Test Plugin")
+        self.manager = plugin_agents.get_plugin_manager_agent(self.context, context_info="CONTEXT INFO")
+        self.tools = {tool.name: tool for tool in self.manager.tools}
+
+    def test_sub_agent_built_with_manager_inputs_on_invoke(self):
+        sub_agent = MagicMock()
+        run_context = SimpleNamespace(context=self.context)
+        with patch('plugin_agents._build_agent', return_value=sub_agent) as mock_build, \
+                patch('plugin_agents.Runner.run', new=AsyncMock(return_value=SimpleNamespace(new_items=[]))) as mock_run:
+            tool = self.tools["check_compliance"]
+            mock_build.assert_not_called()
+
+            asyncio.run(tool.on_invoke_tool(run_context, json.dumps({"input": "check ./plugins/test"})))
+
+        mock_build.assert_called_once_with("compliance", self.context, "CONTEXT INFO")
+        mock_run.assert_awaited_once_with(starting_agent=sub_agent, input="check ./plugins/test", context=self.context)
+
+    def test_tool_schema_matches_as_tool(self):
+        for kind, tool_name, tool_description in plugin_agents._SUB_AGENT_TOOLS:
+            expected = Agent(name=kind).as_tool(tool_name=tool_name, tool_description=tool_description)
+            tool = self.tools[tool_name]
+            self.assertEqual(tool.description, expected.description)
+            self.assertEqual(tool.params_json_schema, expected.params_json_schema)
+            self.assertEqual(tool.strict_json_schema, expected.strict_json_schema)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import itertools
+import re
+import sys
+import os
+
+# Add the parent directory to the sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import security_guardrails
+from security_guardrails import SecurityGuardrails, GuardrailSeverity
+
+def wordpress_findings(code):
+    """Names of the WordPress checks reported for the code, in report order."""
+    prefix = "WordPress security issue: "
+    return [
+        v.message[len(prefix):]
+        for v in SecurityGuardrails()._check_code_security(code)
+        if v.message.startswith(prefix)
+    ]
+
+class TestDirectFileAccess(unittest.TestCase):
+
+    def test_guarded_php_file_is_clean(self):
+        code = (
+            "<?php\n"
+            "if ( ! defined( 'ABSPATH' ) ) exit;\n"
+            "function my_plugin_init() {\n"
+            "    add_action( 'init', 'my_plugin_register' );\n"
+            "}\n"
+        )
+        self.assertEqual(SecurityGuardrails()._check_code_security(code), [])
+
+    def test_unguarded_php_file_gets_one_finding(self):
+        code = "<?php\n$rows = $wpdb->get_results( 'SELECT 1' );\n"
+        violations = SecurityGuardrails()._check_code_security(code)
+        self.assertEqual(len(violations), 1)
+        self.assertEqual(violations[0].message, "WordPress security issue: direct_file_access")
+        self.assertEqual(violations[0].severity, GuardrailSeverity.HIGH)
+
+    def test_bare_open_tag_reported_once(self):
+        self.assertEqual(wordpress_findings("<?php\n"), ["missing_abspath"])
+
+    def test_non_php_text_gets_none(self):
+        for text in (
+            "jQuery.post( ajaxurl, { nonce: data.nonce, rows: wpdb_rows } );",
+            "body { color: #333; }",
+            "This plugin adds a shortcode that lists recent posts.",
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(SecurityGuardrails()._check_code_security(text), [])
+
+class TestCombinedWordpressChecks(unittest.TestCase):
+
+    POSITIONAL_CHECKS = ("missing_abspath", "missing_nonce", "unsafe_output", "missing_capability")
+
+    def test_all_positional_checks_reported_in_table_order(self):
+        # Source order is the reverse of the table order
+        code = (
+            "<?php\n"
+            "if ( ! defined( 'ABSPATH' ) ) exit;\n"
+            "add_menu_page( 'Settings', 'Settings', 'manage_options', 'my-plugin', 'my_page' );\n"
+            "echo $_GET['tab'];\n"
+            "add_action( 'wp_ajax_my_save', 'my_save' );\n"
+        )
+        self.assertEqual(wordpress_findings(code), ["missing_nonce", "unsafe_output", "missing_capability"])
+        # missing_abspath only matches a file that is nothing but the open tag,
+        # so it can never occur together with the other three
+        self.assertEqual(wordpress_findings("<?php "), ["missing_abspath"])
+
+    def test_combined_pass_matches_separate_searches(self):
+        fragments = [
+            "<?php", "\n", " ", "wp_ajax_save", "admin_post_export", "echo $_GET['x']", "echo $_POST",
+            "add_menu_page(", "add_submenu_page(", "wp_verify_nonce", "current_user_can", "echo ",
+        ]
+        separate = {
+            name: re.compile(security_guardrails._casefolded(security_guardrails.WORDPRESS_SECURITY_PATTERNS[name]))
+            for name in self.POSITIONAL_CHECKS
+        }
+        for parts in itertools.product(fragments, repeat=3):
+            code = "".join(parts).lower()
+            with self.subTest(code=code):
+                combined = {m.lastgroup for m in security_guardrails._WORDPRESS_SECURITY_RE.finditer(code)}
+                expected = {name for name, regex in separate.items() if regex.search(code)}
+                self.assertEqual(combined, expected)
+
+if __name__ == '__main__':
+    unittest.main()
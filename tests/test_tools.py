@@ -1,12 +1,21 @@
 import unittest
 from unittest.mock import patch, MagicMock
+import asyncio
+import json
+import subprocess
 import sys
 import os
+import tempfile
 
 # Add the parent directory to the sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from tools import log_planning, log_start_writing_files, log_finish_writing_files, log_checking_compliance, log_testing_plugin
+from tools import check_plugin_syntax_batch, write_files
+
+def invoke_tool(tool, **kwargs):
+    """Run a function tool the way the agents runner does."""
+    return asyncio.run(tool.on_invoke_tool(None, json.dumps(kwargs)))
 
 class TestLoggingTools(unittest.TestCase):
     
@@ -40,5 +49,96 @@ class TestLoggingTools(unittest.TestCase):
         mock_logger.assert_called_once_with("Activating plugin simulation...")
         self.assertEqual(result, "Logged start of plugin testing.")
 
+class TestWriteFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+
+    def path(self, *parts):
+        return os.path.join(self.root.name, *parts)
+
+    def test_writes_nested_files_creating_each_directory_once(self):
+        files = [
+            {"filename": self.path("my-plugin", "my-plugin.php"), "content": "<?php\n"},
+            {"filename": self.path("my-plugin", "includes", "admin.php"), "content": "<?php // admin\n"},
+            {"filename": self.path("my-plugin", "includes", "ajax.php"), "content": "<?php // ajax\n"},
+        ]
+        with patch('tools.Path.mkdir', autospec=True, side_effect=lambda self, **kwargs: os.makedirs(self, exist_ok=True)) as mock_mkdir:
+            result = invoke_tool(write_files, files=files)
+
+        self.assertEqual(result, "Successfully written 3 files")
+        self.assertEqual(
+            [str(c.args[0]) for c in mock_mkdir.call_args_list],
+            [self.path("my-plugin"), self.path("my-plugin", "includes")]
+        )
+        for f in files:
+            with open(f["filename"], encoding="utf-8") as written:
+                self.assertEqual(written.read(), f["content"])
+
+    def test_reports_partial_failure_per_file(self):
+        # A regular file where a directory is expected makes that directory impossible to create
+        with open(self.path("blocker"), "w") as f:
+            f.write("")
+        files = [
+            {"filename": self.path("ok.php"), "content": "<?php\n"},
+            {"filename": self.path("blocker", "a.php"), "content": "<?php\n"},
+            {"filename": self.path("blocker", "b.php"), "content": "<?php\n"},
+        ]
+        result = invoke_tool(write_files, files=files)
+
+        lines = result.splitlines()
+        self.assertEqual(lines[0], "Wrote 1 of 3 files")
+        self.assertEqual(len(lines), 3)
+        self.assertIn(self.path("blocker", "a.php"), lines[1])
+        self.assertIn(self.path("blocker", "b.php"), lines[2])
+        self.assertTrue(os.path.exists(self.path("ok.php")))
+
+class TestSyntaxBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.plugin_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.plugin_dir.cleanup)
+        os.makedirs(os.path.join(self.plugin_dir.name, "includes"))
+        self.files = sorted(
+            os.path.join(self.plugin_dir.name, name) for name in ("plugin.php", "includes/admin.php", "includes/ajax.php")
+        )
+        for path in self.files:
+            with open(path, "w") as f:
+                f.write("<?php\n")
+
+    @staticmethod
+    def lint_result(args, stdout, returncode=0):
+        return subprocess.CompletedProcess(args, returncode, stdout, "")
+
+    @patch('tools.subprocess.run')
+    def test_single_process_when_php_checks_every_file(self, mock_run):
+        mock_run.side_effect = lambda cmd, **kwargs: self.lint_result(
+            cmd, "".join(f"No syntax errors detected in {path}\n" for path in self.files)
+        )
+        result = invoke_tool(check_plugin_syntax_batch, plugin_dir=self.plugin_dir.name)
+
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args.args[0], ["php", "-l", *self.files])
+        self.assertTrue(result.startswith("Syntax OK for 3 files"))
+
+    @patch('tools.subprocess.run')
+    def test_falls_back_per_file_on_older_php(self, mock_run):
+        broken = self.files[1]
+
+        def run(cmd, **kwargs):
+            # Before PHP 8.3 only the first file is checked
+            path = cmd[2]
+            if path == broken:
+                return self.lint_result(cmd, f"PHP Fatal error:  Cannot redeclare foo() in {path} on line 3\nErrors parsing {path}\n", 255)
+            return self.lint_result(cmd, f"No syntax errors detected in {path}\n")
+
+        mock_run.side_effect = run
+        result = invoke_tool(check_plugin_syntax_batch, plugin_dir=self.plugin_dir.name)
+
+        self.assertEqual([c.args[0][2:] for c in mock_run.call_args_list], [self.files, [self.files[1]], [self.files[2]]])
+        self.assertTrue(result.startswith("Syntax Error"))
+        self.assertIn("Cannot redeclare foo()", result)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
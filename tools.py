@@ -1,12 +1,14 @@
 from agents import function_tool
+import re
 import subprocess
 import os
 import shutil
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from loguru import logger
 import asyncio
 from pathlib import Path
+from pydantic import BaseModel, Field
 
 # --- New Logging Tools ---
 @function_tool
@@ -40,18 +42,13 @@ def log_planning() -> str:
     return "Logged planning stage."
 
 # --- Enhanced File Tools ---
-@function_tool
-def write_file(filename: str, content: str) -> str:
-    """Write content to a file with proper error handling and directory creation.
-    
-    Args:
-        filename: Path to the file to write
-        content: Content to write to the file
-    """
+def _write_text(filename: str, content: str, create_parent: bool = True) -> str:
+    """Write one file, creating parent directories unless told they exist, and return a status message."""
     try:
         # Ensure the directory exists
         filepath = Path(filename)
-        filepath.parent.mkdir(parents=True, exist_ok=True)
+        if create_parent:
+            filepath.parent.mkdir(parents=True, exist_ok=True)
         
         # Write the file with UTF-8 encoding
         filepath.write_text(content, encoding='utf-8')
@@ -70,6 +67,47 @@ def write_file(filename: str, content: str) -> str:
         logger.exception(f"Unexpected error writing {filename}")
         return f"Error writing {filename}: {str(e)}"
 
+@function_tool
+def write_file(filename: str, content: str) -> str:
+    """Write content to a file with proper error handling and directory creation.
+    
+    Args:
+        filename: Path to the file to write
+        content: Content to write to the file
+    """
+    return _write_text(filename, content)
+
+class FileToWrite(BaseModel):
+    filename: str = Field(description="Path to the file to write")
+    content: str = Field(description="Content to write to the file")
+
+@function_tool
+def write_files(files: List[FileToWrite]) -> str:
+    """Write several files in one call, creating directories as needed.
+    
+    Args:
+        files: Files to write, each with its full path and content
+    """
+    # Create each distinct directory once; files whose directory could not be
+    # created fall back to _write_text, which reports the error per file
+    created_dirs = set()
+    for directory in dict.fromkeys(Path(f.filename).parent for f in files):
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(directory)
+        except OSError:
+            pass
+    
+    results = [
+        _write_text(f.filename, f.content, create_parent=Path(f.filename).parent not in created_dirs)
+        for f in files
+    ]
+    failed = [r for r in results if r.startswith("Error")]
+    logger.debug(f"Wrote {len(results) - len(failed)} of {len(results)} files")
+    if failed:
+        return "\n".join([f"Wrote {len(results) - len(failed)} of {len(results)} files"] + failed)
+    return f"Successfully written {len(results)} files"
+
 @function_tool
 def read_file(filename: str) -> str:
     """Read the contents of a file.
@@ -162,6 +200,42 @@ def delete_file(filename: str) -> str:
         return f"Error: {str(e)}"
 
 # --- Enhanced Subprocess Tools ---
+async def _kill_process(process: asyncio.subprocess.Process):
+    """Kill a child process if it is still running and reap it."""
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+    await process.wait()
+
+async def _run_subprocess(cmd: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """Non-blocking equivalent of subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=timeout).
+    
+    Raises the same TimeoutExpired, CalledProcessError and FileNotFoundError
+    exceptions, so callers keep their existing error handling.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        await _kill_process(process)
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except BaseException:
+        # Cancelled (e.g. the run was aborted): do not leave the child orphaned
+        await _kill_process(process)
+        raise
+    
+    stdout = stdout.decode('utf-8', errors='replace')
+    stderr = stderr.decode('utf-8', errors='replace')
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
 @function_tool
 async def run_command_async(command: List[str], timeout: int = 300) -> Dict[str, Any]:
     """Run a command asynchronously with timeout support.
@@ -208,7 +282,7 @@ async def run_command_async(command: List[str], timeout: int = 300) -> Dict[str,
         }
 
 @function_tool
-def docker_compose_up(detached: bool = True, build: bool = False) -> str:
+async def docker_compose_up(detached: bool = True, build: bool = False) -> str:
     """Start Docker Compose services with enhanced options.
     
     Args:
@@ -223,7 +297,7 @@ def docker_compose_up(detached: bool = True, build: bool = False) -> str:
         if build:
             cmd.append("--build")
             
-        proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        proc = await _run_subprocess(cmd)
         logger.success("Docker containers started.")
         logger.debug(f"docker-compose up output: {proc.stdout}")
         if proc.stderr:
@@ -238,7 +312,7 @@ def docker_compose_up(detached: bool = True, build: bool = False) -> str:
         return f"Error: {error_msg}"
 
 @function_tool
-def activate_plugin(plugin_slug: str, network_wide: bool = False) -> str:
+async def activate_plugin(plugin_slug: str, network_wide: bool = False) -> str:
     """Activate a WordPress plugin with enhanced options.
     
     Args:
@@ -250,13 +324,7 @@ def activate_plugin(plugin_slug: str, network_wide: bool = False) -> str:
         if network_wide:
             cmd.append("--network")
             
-        proc = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=60
-        )
+        proc = await _run_subprocess(cmd, timeout=60)
         logger.success(f"Plugin {plugin_slug} activated.")
         logger.debug(f"wp plugin activate output: {proc.stdout}")
         return f"Success: {proc.stdout}"
@@ -273,7 +341,7 @@ def activate_plugin(plugin_slug: str, network_wide: bool = False) -> str:
         return f"Error: {error_msg}"
 
 @function_tool
-def list_plugins(status: str = "all") -> str:
+async def list_plugins(status: str = "all") -> str:
     """List WordPress plugins with filtering options.
     
     Args:
@@ -286,13 +354,7 @@ def list_plugins(status: str = "all") -> str:
             cmd.extend(["--status", status])
         cmd.append("--format=json")
         
-        proc = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=30
-        )
+        proc = await _run_subprocess(cmd, timeout=30)
         
         # Parse JSON output for better formatting
         try:
@@ -347,6 +409,60 @@ def check_plugin_syntax(plugin_path: str) -> str:
         logger.exception(f"Error checking syntax for {plugin_path}")
         return f"Error: {str(e)}"
 
+# File name reported by `php -l` for each file it checked, passed or failed
+_PHP_LINT_RESULT_RE = re.compile(r'^(?:No syntax errors detected in|Errors parsing) (.+?)\s*$', re.MULTILINE)
+
+@function_tool
+def check_plugin_syntax_batch(plugin_dir: str) -> str:
+    """Check PHP syntax of every .php file in a plugin directory, in one PHP process where possible.
+    
+    Args:
+        plugin_dir: Path to the plugin directory to check
+    """
+    try:
+        php_files = sorted(str(p) for p in Path(plugin_dir).rglob("*.php"))
+        if not php_files:
+            return f"No PHP files found in {plugin_dir}"
+        
+        # php -l checks several files in one run from PHP 8.3; older versions
+        # only check the first, so any file missing from the output is checked on its own
+        proc = subprocess.run(
+            ["php", "-l", *php_files],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        outputs = [proc.stdout + proc.stderr]
+        failed = proc.returncode != 0
+        
+        checked = set(_PHP_LINT_RESULT_RE.findall(outputs[0]))
+        for php_file in php_files:
+            if php_file not in checked:
+                single = subprocess.run(
+                    ["php", "-l", php_file],
+                    capture_output=True,
+                    text=True,
+                    timeout=10
+                )
+                outputs.append(single.stdout + single.stderr)
+                failed = failed or single.returncode != 0
+        
+        output = "".join(outputs)
+        if not failed:
+            logger.success(f"PHP syntax OK for {len(php_files)} files in {plugin_dir}")
+            return f"Syntax OK for {len(php_files)} files:\n{output}"
+        else:
+            logger.error(f"PHP syntax errors in {plugin_dir}")
+            return f"Syntax Error:\n{output}"
+            
+    except subprocess.TimeoutExpired:
+        return f"Error: Syntax check timed out for {plugin_dir}"
+    except FileNotFoundError:
+        return "Error: PHP CLI not found. Please ensure PHP is installed."
+    except Exception as e:
+        logger.exception(f"Error checking syntax for {plugin_dir}")
+        return f"Error: {str(e)}"
+
 @function_tool
 def test_with_playground(plugin_slug: str) -> str:
     """Test plugin using WordPress Playground in a headless browser.